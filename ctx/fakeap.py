@@ -13,24 +13,32 @@ fake ap code to ctx
 """
 
 # standard library imports
-import inspect
+import ctypes
+import ctypes.util
+import errno
+import functools
 import logging
+import mmap
 import multiprocessing
 import os
 import random
 import signal
+import socket
 import sys
-from time import sleep
+from time import monotonic, sleep
 
 # suppress scapy warnings
 logging.getLogger("scapy.runtime").setLevel(logging.ERROR)
 
 # third party imports
 try:
-    from scapy.all import LLC, SNAP, Dot11, Dot11QoS, RadioTap, Raw, Scapy_Exception
-    from scapy.all import conf as scapyconf  # type: ignore
-    from scapy.all import get_if_hwaddr
+    # import only the layers we build frames from rather than scapy.all
+    from scapy.arch import get_if_hwaddr
     from scapy.arch.unix import get_if_raw_hwaddr
+    from scapy.config import conf as scapyconf  # type: ignore
+    from scapy.error import Scapy_Exception
+    from scapy.layers.dot11 import Dot11, Dot11QoS, RadioTap
+    from scapy.layers.l2 import LLC, SNAP
 except ModuleNotFoundError as error:
     if error.name == "scapy":
         print("required module scapy not found.")
@@ -42,13 +50,127 @@ DOT11_TYPE_DATA = 2
 DOT11_SUBTYPE_DATA = 0x00
 DOT11_SUBTYPE_QOS_DATA = 0x08
 
+# frames are only batched when tx_interval is short enough that per frame
+# syscalls are the limit: a batch never spans more than TX_BATCH_WINDOW
+# seconds of Tx, so longer intervals keep sending one frame per interval.
+# NOTE: TxData currently overrides tx_interval with 0.1024 s, which always
+# yields a batch size of 1; batching only kicks in if that override goes.
+TX_BATCH_WINDOW = 0.001
+TX_BATCH_SIZE_MAX = 100
+
+# Tx socket send buffer and egress priority; SO_SNDBUFFORCE lets root go past
+# net.core.wmem_max (not exported by the socket module)
+TX_SNDBUF = 12_582_912
+TX_SO_PRIORITY = 6
+SO_SNDBUFFORCE = 32
+
+# real-time priority requested for the Tx loop (SCHED_FIFO is 1-99)
+TX_SCHED_PRIORITY = 20
+
+# payloads are sliced out of a pool of random bytes which is refilled in
+# place every RANDOM_POOL_REFRESH frames
+RANDOM_POOL_SIZE = 65_536
+RANDOM_POOL_REFRESH = 1_000
+
+# AF_PACKET Tx ring (see linux/if_packet.h and packet_mmap.rst)
+SOL_PACKET = 263
+PACKET_VERSION = 10
+PACKET_TX_RING = 13
+PACKET_LOSS = 14
+TPACKET_V2 = 1
+TPACKET_ALIGNMENT = 16
+TP_STATUS_AVAILABLE = 0
+TP_STATUS_SEND_REQUEST = 1
+TX_RING_FRAMES = 128
+
+
+class _TPacketReq(ctypes.Structure):
+    """struct tpacket_req"""
+
+    _fields_ = [
+        ("tp_block_size", ctypes.c_uint),
+        ("tp_block_nr", ctypes.c_uint),
+        ("tp_frame_size", ctypes.c_uint),
+        ("tp_frame_nr", ctypes.c_uint),
+    ]
+
+
+class _TPacket2Hdr(ctypes.Structure):
+    """struct tpacket2_hdr"""
+
+    _fields_ = [
+        ("tp_status", ctypes.c_uint32),
+        ("tp_len", ctypes.c_uint32),
+        ("tp_snaplen", ctypes.c_uint32),
+        ("tp_mac", ctypes.c_uint16),
+        ("tp_net", ctypes.c_uint16),
+        ("tp_sec", ctypes.c_uint32),
+        ("tp_nsec", ctypes.c_uint32),
+        ("tp_vlan_tci", ctypes.c_uint16),
+        ("tp_vlan_tpid", ctypes.c_uint16),
+        ("tp_padding", ctypes.c_uint8 * 4),
+    ]
+
+
+# without PACKET_TX_HAS_OFF, Tx data starts right after the aligned header
+TPACKET2_DATA_OFFSET = -(-ctypes.sizeof(_TPacket2Hdr) // TPACKET_ALIGNMENT) * (
+    TPACKET_ALIGNMENT
+)
+
+
+class _IOVec(ctypes.Structure):
+    """struct iovec"""
+
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    """struct msghdr"""
+
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IOVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    """struct mmsghdr"""
+
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+_libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+_sendmmsg = getattr(_libc, "sendmmsg", None)
+if _sendmmsg is not None:
+    _sendmmsg.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int]
+    _sendmmsg.restype = ctypes.c_int
+_getrandom = getattr(_libc, "getrandom", None)
+if _getrandom is not None:
+    _getrandom.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_uint]
+    _getrandom.restype = ctypes.c_ssize_t
+
+
+@functools.lru_cache(maxsize=8)
+def _mac_for(interface: str) -> str:
+    """Look up and cache the mac address for an interface"""
+    try:
+        mac = get_if_hwaddr(interface)
+    except Scapy_Exception:
+        mac = ":".join(format(x, "02x") for x in get_if_raw_hwaddr(interface)[1])
+    return mac
+
 
 class TxData(multiprocessing.Process):
     """Handle Tx of fake AP frames"""
 
     def __init__(self, config):
         super(TxData, self).__init__()
-        self.log = logging.getLogger(inspect.stack()[0][1].split("/")[-1])
+        self.log = logging.getLogger(self.__class__.__name__.lower())
         self.log.debug("ctx pid: %s; parent pid: %s", os.getpid(), os.getppid())
         self.log.debug("config passed to ctx: %s", config)
         if not isinstance(config, dict):
@@ -71,12 +193,19 @@ class TxData(multiprocessing.Process):
         tx_payload_min: "str" = config.get("GENERAL").get("tx_payload_min")
         if not tx_payload_min:
             raise ValueError("cannot determine minimum payload size")
-        self.tx_payload_min = float(tx_payload_min)
+        self.tx_payload_min = int(float(tx_payload_min))
 
         tx_payload_max: "str" = config.get("GENERAL").get("tx_payload_max")
         if not tx_payload_max:
             raise ValueError("cannot determine minimum payload size")
-        self.tx_payload_max = float(tx_payload_max)
+        self.tx_payload_max = int(float(tx_payload_max))
+        if self.tx_payload_min > self.tx_payload_max:
+            raise ValueError(
+                "minimum payload size is greater than maximum payload size"
+            )
+
+        tx_cpu = config.get("GENERAL").get("tx_cpu")
+        self.tx_cpu = None if tx_cpu in (None, "") else int(tx_cpu)
 
         scapyconf.iface = self.interface
         self.l2socket = None
@@ -95,6 +224,8 @@ class TxData(multiprocessing.Process):
             )
             sys.exit(signal.SIGALRM)
         self.log.debug(self.l2socket.outs)
+        # the configured tx_interval is overridden here; with 0.1024 s the Tx
+        # batch size below is always 1 (see TX_BATCH_WINDOW)
         self.tx_interval = 0.102_400
 
         self.mac = self.get_mac(self.interface)
@@ -108,37 +239,279 @@ class TxData(multiprocessing.Process):
         )
 
         self.data_frame = RadioTap() / dot11 / Dot11QoS() / LLC() / SNAP()
+        # the header is invariant, so serialize it once instead of per frame
+        self._hdr = bytes(self.data_frame)
+
+        # payload lengths are lo + randbelow(span); Random._randbelow skips the
+        # argument checks randint/randrange repeat on every call
+        self._rng = random.Random()
+        self._randbelow = getattr(self._rng, "_randbelow", self._rng.randrange)
+        self._lo = self.tx_payload_min
+        self._span = self.tx_payload_max - self.tx_payload_min + 1
+        self._rand_buf = ctypes.create_string_buffer(RANDOM_POOL_SIZE)
+        self._rand_pool = memoryview(self._rand_buf).cast("B")
+        self.refill_random_pool()
+        self._pool_ctr = 0
+
+        # frames are assembled in place: the header is written into each Tx
+        # buffer once and only the payload after it changes per frame
+        self._hdr_len = len(self._hdr)
+        self._buf = bytearray(self._hdr_len + self.tx_payload_max)
+        self._buf[: self._hdr_len] = self._hdr
+        self._mv = memoryview(self._buf)
+
+        self.tx_batch_size = max(
+            1, min(int(TX_BATCH_WINDOW / self.tx_interval), TX_BATCH_SIZE_MAX)
+        )
+        self.log.debug("Tx batch size is %s", self.tx_batch_size)
+        self.setup_socket()
+        self.setup_tx_ring()
+        if self._ring is None:
+            self.setup_batch()
+
+        self.setup_scheduling()
 
         self.log.info("starting QoS data frame transmissions")
-        self.every(self.tx_interval, self.tx_data)
+        # frames in a batch go out back to back, so pace the batches at the
+        # interval of the whole batch (at most TX_BATCH_WINDOW) to keep the
+        # same average frame rate
+        self.every(self.tx_interval * self.tx_batch_size, self.tx_data)
 
     def get_mac(self, interface: str) -> str:
         """Get the mac address for a specified interface"""
+        return _mac_for(interface)
+
+    def setup_scheduling(self) -> None:
+        """Pin the Tx loop to a CPU and request SCHED_FIFO to reduce jitter
+
+        Both are opt-in: nothing changes unless tx_cpu is configured.
+        """
+        if self.tx_cpu is None:
+            return
+        try:
+            os.sched_setaffinity(0, {self.tx_cpu})
+            self.log.debug("pinned Tx to cpu %s", self.tx_cpu)
+        except OSError as error:
+            self.log.warning("unable to pin Tx to cpu %s: %s", self.tx_cpu, error)
         try:
-            mac = get_if_hwaddr(interface)
-        except Scapy_Exception:
-            mac = ":".join(format(x, "02x") for x in get_if_raw_hwaddr(interface)[1])
-        return mac
+            os.sched_setscheduler(
+                0, os.SCHED_FIFO, os.sched_param(TX_SCHED_PRIORITY)  # type: ignore
+            )
+        except OSError as error:
+            self.log.debug(
+                "unable to set SCHED_FIFO (%s); using default scheduler", error
+            )
 
-    def generate_random_data(self, min=64, max=512):
-        """Generate random payload data."""
-        length = random.randint(min, max)
-        return os.urandom(length)
+    def setup_socket(self) -> None:
+        """Grow the send buffer for batched Tx and raise the egress priority"""
+        sock = self.l2socket.outs  # type: ignore
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, SO_SNDBUFFORCE, TX_SNDBUF)
+        except OSError:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, TX_SNDBUF)
+            except OSError as error:
+                self.log.debug("unable to set SO_SNDBUF: %s", error)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_PRIORITY, TX_SO_PRIORITY)
+        except OSError as error:
+            self.log.debug("unable to set SO_PRIORITY: %s", error)
+        self.log.debug(
+            "Tx socket send buffer is %s bytes",
+            sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF),
+        )
+
+    def setup_tx_ring(self) -> None:
+        """Attach an mmap'd PACKET_TX_RING to the L2socket, if the kernel allows"""
+        self._ring = None
+        sock = self.l2socket.outs  # type: ignore
+        # power of two frame sizes keep every frame inside a single block
+        frame_size = (
+            1
+            << (
+                TPACKET2_DATA_OFFSET + len(self._hdr) + self.tx_payload_max - 1
+            ).bit_length()
+        )
+        block_size = max(mmap.PAGESIZE, frame_size)
+        frames_per_block = block_size // frame_size
+        block_nr = -(-TX_RING_FRAMES // frames_per_block)
+        req = _TPacketReq(block_size, block_nr, frame_size, block_nr * frames_per_block)
+        try:
+            sock.setsockopt(SOL_PACKET, PACKET_VERSION, TPACKET_V2)
+            # drop malformed frames instead of stalling the ring on them
+            sock.setsockopt(SOL_PACKET, PACKET_LOSS, 1)
+            sock.setsockopt(SOL_PACKET, PACKET_TX_RING, bytes(req))
+            ring = mmap.mmap(
+                sock.fileno(),
+                block_size * block_nr,
+                mmap.MAP_SHARED,
+                mmap.PROT_READ | mmap.PROT_WRITE,
+            )
+        except OSError as error:
+            self.log.debug("unable to setup PACKET_TX_RING: %s", error)
+            return
+        self._ring_frame_size = frame_size
+        # payload offsets of every slot, so filling a slot needs no arithmetic
+        self._ring_offsets = []
+        for i in range(req.tp_frame_nr):
+            offset = i * frame_size + TPACKET2_DATA_OFFSET
+            ring[offset : offset + self._hdr_len] = self._hdr
+            self._ring_offsets.append(offset + self._hdr_len)
+        self._ring_slots = [
+            _TPacket2Hdr.from_buffer(ring, i * frame_size)
+            for i in range(req.tp_frame_nr)
+        ]
+        self._ring_idx = 0
+        self._ring = ring
+        self.log.debug(
+            "using PACKET_TX_RING with %s frames of %s bytes",
+            req.tp_frame_nr,
+            frame_size,
+        )
+
+    def fill_ring(self) -> None:
+        """Copy a batch of payloads into the Tx ring and mark them for sending"""
+        # everything the per frame loop touches is bound to a local
+        generate = self.generate_random_data
+        hdr_len = self._hdr_len
+        ring = self._ring
+        slots = self._ring_slots
+        offsets = self._ring_offsets
+        ring_size = len(slots)
+        idx = self._ring_idx
+        for _ in range(self.tx_batch_size):
+            slot = slots[idx]
+            if slot.tp_status != TP_STATUS_AVAILABLE:
+                # ring is full; a blocking flush returns once the kernel drained it
+                self.l2socket.outs.send(b"")  # type: ignore
+            payload = generate()
+            offset = offsets[idx]
+            ring[offset : offset + len(payload)] = payload  # type: ignore
+            slot.tp_len = hdr_len + len(payload)
+            slot.tp_status = TP_STATUS_SEND_REQUEST
+            idx += 1
+            if idx == ring_size:
+                idx = 0
+        self._ring_idx = idx
+
+    def ring_flush(self) -> None:
+        """Ask the kernel to Tx every frame marked in the ring without waiting"""
+        try:
+            self.l2socket.outs.send(b"", socket.MSG_DONTWAIT)  # type: ignore
+        except BlockingIOError:
+            # queued frames stay marked and go out with the next flush
+            pass
+
+    def setup_batch(self) -> None:
+        """Pre-allocate the frame buffers and mmsghdr array used by sendmmsg
+
+        Only used when the Tx ring cannot be set up. With the current
+        tx_interval override each sendmmsg call carries a single frame.
+        """
+        self._msgs = None
+        if _sendmmsg is None:
+            self.log.debug("sendmmsg not available; falling back to per frame Tx")
+            return
+        self._fd = self.l2socket.outs.fileno()  # type: ignore
+        self._bufs = [
+            ctypes.create_string_buffer(self._hdr, len(self._buf))
+            for _ in range(self.tx_batch_size)
+        ]
+        self._buf_mvs = [memoryview(buf).cast("B") for buf in self._bufs]
+        self._iovs = (_IOVec * self.tx_batch_size)()
+        self._msgs = (_MMsgHdr * self.tx_batch_size)()
+        for i in range(self.tx_batch_size):
+            self._iovs[i].iov_base = ctypes.addressof(self._bufs[i])
+            self._msgs[i].msg_hdr.msg_iov = ctypes.pointer(self._iovs[i])
+            self._msgs[i].msg_hdr.msg_iovlen = 1
+
+    def send_batch(self) -> None:
+        """Tx the prepared batch, resubmitting whatever the kernel did not take"""
+        sent = 0
+        while sent < self.tx_batch_size:
+            ret = _sendmmsg(
+                self._fd,
+                ctypes.byref(self._msgs, sent * ctypes.sizeof(_MMsgHdr)),
+                self.tx_batch_size - sent,
+                0,
+            )
+            if ret < 0:
+                err = ctypes.get_errno()
+                if err == errno.EINTR:
+                    continue
+                raise OSError(err, os.strerror(err))
+            sent += ret
+
+    def refill_random_pool(self) -> None:
+        """Refill the random pool in place with getrandom(2)"""
+        if _getrandom is None:
+            self._rand_pool[:] = os.urandom(RANDOM_POOL_SIZE)
+            return
+        addr = ctypes.addressof(self._rand_buf)
+        filled = 0
+        while filled < RANDOM_POOL_SIZE:
+            ret = _getrandom(addr + filled, RANDOM_POOL_SIZE - filled, 0)
+            if ret < 0:
+                err = ctypes.get_errno()
+                if err == errno.EINTR:
+                    continue
+                raise OSError(err, os.strerror(err))
+            filled += ret
+
+    def generate_random_data(self):
+        """Generate random payload data as a view into the random pool."""
+        randbelow = self._randbelow
+        length = self._lo + randbelow(self._span)
+        offset = randbelow(RANDOM_POOL_SIZE - length + 1)
+        payload = self._rand_pool[offset : offset + length]
+        self._pool_ctr += 1
+        if self._pool_ctr >= RANDOM_POOL_REFRESH:
+            self.refill_random_pool()
+            self._pool_ctr = 0
+        return payload
 
     def every(self, interval, task) -> None:
-        """Attempt to address beacon drift"""
+        """Attempt to address beacon drift
+
+        Sleep until an absolute deadline rather than for a fixed interval so
+        the runtime of task() is not added to the period. If we overrun a
+        deadline, resync to now instead of bursting to catch up.
+        """
+        deadline = monotonic()
         while True:
             task()
-            sleep(interval)
+            deadline += interval
+            delay = deadline - monotonic()
+            if delay > 0:
+                sleep(delay)
+            else:
+                deadline = monotonic()
 
     def tx_data(self) -> None:
-        """Update and Tx QoS Data Frame"""
-        payload = self.generate_random_data(
-            min=self.tx_payload_min, max=self.tx_payload_max
-        )
-        data_frame = self.data_frame / Raw(load=payload)
+        """Update and Tx a batch of QoS Data Frames"""
+        # bind what the per frame loop needs to locals
+        generate = self.generate_random_data
+        hdr_len = self._hdr_len
         try:
-            self.l2socket.send(data_frame)  # type: ignore
+            if self._ring is not None:
+                self.fill_ring()
+                self.ring_flush()
+                return
+            if self._msgs is None:
+                send = self.l2socket.outs.send  # type: ignore
+                mv = self._mv
+                for _ in range(self.tx_batch_size):
+                    payload = generate()
+                    frame_len = hdr_len + len(payload)
+                    mv[hdr_len:frame_len] = payload
+                    send(mv[:frame_len])
+                return
+            for buf_mv, iov in zip(self._buf_mvs, self._iovs):
+                payload = generate()
+                frame_len = hdr_len + len(payload)
+                buf_mv[hdr_len:frame_len] = payload
+                iov.iov_len = frame_len
+            self.send_batch()
         except OSError as error:
             for event in ("Network is down", "No such device"):
                 if event in error.strerror:
@@ -15,18 +15,19 @@ provides init functions that are used to help setup the app.
 # standard library imports
 import argparse
 import configparser
-import inspect
 import json
 import logging
 import logging.config
 import os
+import re
 import shutil
 import signal
 import subprocess
 import sys
 from base64 import b64encode
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
 __tools = [
     "tcpdump",
@@ -40,13 +41,6 @@ __tools = [
     "wpa_cli",
 ]
 
-# are the required tools installed?
-for tool in __tools:
-    if shutil.which(tool) is None:
-        print(f"It looks like you do not have {tool} installed.")
-        print("Please install using your distro's package manager.")
-        sys.exit(signal.SIGABRT)
-
 
 # app imports
 from .__init__ import __version__
@@ -54,6 +48,20 @@ from .constants import CHANNELS, CONFIG_FILE
 
 FILES_PATH = "/var/www/html/ctx"
 
+_VALID_CHANNELS = frozenset(ch for band in CHANNELS.values() for ch in band)
+
+_FREQ_RANGES = ((2412, 2484), (5180, 5905), (5955, 7115))
+_FREQ_RANGE_STARTS = tuple(start for start, _ in _FREQ_RANGES)
+
+
+def verify_tools() -> None:
+    """Exit if any of the required tools are not installed"""
+    for tool in __tools:
+        if shutil.which(tool) is None:
+            print(f"It looks like you do not have {tool} installed.")
+            print("Please install using your distro's package manager.")
+            sys.exit(signal.SIGABRT)
+
 
 def setup_logger(args) -> None:
     """Configure and set logging levels"""
@@ -83,7 +91,7 @@ def setup_logger(args) -> None:
 def channel(value: str) -> int:
     """Check if channel is valid"""
     ch = int(value)
-    if any(ch in band for band in CHANNELS.values()):
+    if ch in _VALID_CHANNELS:
         return ch
     raise argparse.ArgumentTypeError(f"{ch} is not a valid channel")
 
@@ -105,6 +113,14 @@ def payload_size(value: str) -> int:
     raise argparse.ArgumentTypeError(f"{size} is not an integer between 1 and 4096")
 
 
+def cpu(value: str) -> int:
+    """Check if the value is a CPU we are allowed to run on"""
+    cpu = int(value)
+    if cpu in os.sched_getaffinity(0):
+        return cpu
+    raise argparse.ArgumentTypeError(f"{cpu} is not an available CPU")
+
+
 def frequency(freq: str) -> int:
     """Check if the provided frequency is valid"""
     try:
@@ -113,14 +129,13 @@ def frequency(freq: str) -> int:
     except ValueError:
         raise argparse.ArgumentTypeError(f"{freq} is not a number")
 
-    freq_ranges = [(2412, 2484), (5180, 5905), (5955, 7115)]
-
-    for band in freq_ranges:
-        if band[0] <= freq <= band[1]:
-            return freq
+    # find the last range starting at or below freq and check its upper bound
+    idx = bisect_right(_FREQ_RANGE_STARTS, freq) - 1
+    if idx >= 0 and freq <= _FREQ_RANGES[idx][1]:
+        return freq
 
     raise argparse.ArgumentTypeError(
-        f"{freq} not found in these frequency ranges: {freq_ranges}"
+        f"{freq} not found in these frequency ranges: {list(_FREQ_RANGES)}"
     )
 
 
@@ -176,6 +191,12 @@ def setup_parser() -> argparse.ArgumentParser:
         default="64",
         help="customize the Tx payload minimum (default: %(default)s)",
     )
+    parser.add_argument(
+        "--tx_cpu",
+        type=cpu,
+        metavar="CPU",
+        help="pin the Tx process to this CPU and run it with SCHED_FIFO (default: not pinned)",
+    )
     parser.add_argument(
         "--config",
         type=str,
@@ -222,16 +243,14 @@ def get_data_from_iproute2(intf) -> NetworkInterface:
     # Get json output from `ip` command
     result = run_command(["ip", "-json", "address"])
     data = json.loads(result)
-    interface_data = {}
-    for item in data:
-        name = item["ifname"]
-        interface_data[name] = item
+    # stop at the interface we want instead of indexing every interface
+    iface_dict = next((item for item in data if item.get("ifname") == intf), None)
     # Build dataclass for storage and easier test assertion
     iface = NetworkInterface()
-    if intf in interface_data.keys():
-        iface.operstate = interface_data[intf]["operstate"]
-        iface.ifname = interface_data[intf]["ifname"]
-        iface.mac = interface_data[intf]["address"].replace(":", "")
+    if iface_dict:
+        iface.operstate = iface_dict["operstate"]
+        iface.ifname = iface_dict["ifname"]
+        iface.mac = iface_dict["address"].replace(":", "")
     return iface
 
 
@@ -249,10 +268,20 @@ def get_iface_mac(iface: str):
 
 def setup_config(args):
     """Create the configuration (SSID, channel, interface, etc) for the CTX"""
-    log = logging.getLogger(inspect.stack()[0][3])
+    log = logging.getLogger(__name__)
+
+    # every GENERAL key was passed in and would override config.ini anyway
+    #  - tx_interval, tx_payload_max and tx_payload_min have argparse defaults,
+    #    so they always come from args and do not need checking here
+    args_cover_config = bool(
+        (args.channel or args.frequency) and args.interface and args.tx_cpu is not None
+    )
 
     # load in config (a: from default location "/etc/wlanpi-ctx/config.ini" or b: from provided)
-    if os.path.isfile(args.config):
+    if args_cover_config:
+        log.debug("all config options provided as args; skipping %s", args.config)
+        config = {}
+    elif os.path.isfile(args.config):
         try:
             parser = load_config(args.config)
 
@@ -261,6 +290,9 @@ def setup_config(args):
         except configparser.MissingSectionHeaderError as error:
             log.error("config file appears to be corrupt")
             config = {}
+        except (OSError, UnicodeDecodeError) as error:
+            log.error("unable to read config at %s: %s", args.config, error)
+            config = {}
     else:
         log.warning("can not find config at %s", args.config)
         config = {}
@@ -302,6 +334,8 @@ def setup_config(args):
         config["GENERAL"]["tx_payload_max"] = args.tx_payload_max
     if args.tx_payload_min:
         config["GENERAL"]["tx_payload_min"] = args.tx_payload_min
+    if args.tx_cpu is not None:
+        config["GENERAL"]["tx_cpu"] = args.tx_cpu
 
     # ensure channel 1 is an integer and not a bool
     try:
@@ -332,7 +366,69 @@ def strtobool(val):  # noqa: VNE002
         raise ValueError("invalid truth value %r" % (val,))
 
 
-def convert_configparser_to_dict(config: configparser.ConfigParser) -> Dict:
+class FastConfigParser:
+    """Minimal parser for the flat sections found in config.ini
+
+    Only what config.ini uses is supported: `[SECTION]` headers, `key = value`
+    or `key: value` options, continuation lines indented deeper than their
+    option, and full line `#` or `;` comments. Keys are lowercased like
+    configparser does. Any other line raises configparser.ParsingError.
+    """
+
+    _header = re.compile(r"^\[([^\]]+)\]")
+    _kv = re.compile(r"^([^=:]+?)\s*[=:]\s*(.*)$")
+
+    def __init__(self):
+        self._sections: "Dict[str, Dict[str, str]]" = {}
+
+    def read(self, config_file: str) -> None:
+        """Parse config_file into sections"""
+        with open(config_file, encoding="utf-8") as fd:
+            lines = fd.read().splitlines()
+        section = None
+        key = None
+        key_indent = 0
+        error = None
+        for lineno, raw_line in enumerate(lines, start=1):
+            line = raw_line.strip()
+            if not line or line[0] in "#;":
+                continue
+            indent = len(raw_line) - len(raw_line.lstrip())
+            if key is not None and indent > key_indent:
+                # continuation of the previous option's value
+                section[key] += "\n" + line  # type: ignore
+                continue
+            match = self._header.match(line)
+            if match:
+                section = self._sections.setdefault(match.group(1), {})
+                key = None
+                continue
+            if section is None:
+                raise configparser.MissingSectionHeaderError(config_file, lineno, line)
+            match = self._kv.match(line)
+            if not match:
+                # collect every bad line before raising like configparser does
+                if error is None:
+                    error = configparser.ParsingError(config_file)
+                error.append(lineno, repr(line))
+                key = None
+                continue
+            key = match.group(1).lower()
+            key_indent = indent
+            section[key] = match.group(2).strip()
+        if error is not None:
+            raise error
+
+    def sections(self) -> List[str]:
+        """Return a list of section names"""
+        return list(self._sections)
+
+    def items(self, section: str) -> List[Tuple[str, str]]:
+        """Return a list of (key, value) pairs for a section"""
+        return list(self._sections[section].items())
+
+
+def convert_configparser_to_dict(config: FastConfigParser) -> Dict:
     """
     Convert ConfigParser object to dictionary.
 
@@ -353,16 +449,16 @@ def convert_configparser_to_dict(config: configparser.ConfigParser) -> Dict:
     return _dict
 
 
-def load_config(config_file: str) -> configparser.ConfigParser:
+def load_config(config_file: str) -> FastConfigParser:
     """Load in config from external file"""
-    config = configparser.ConfigParser()
+    config = FastConfigParser()
     config.read(config_file)
     return config
 
 
 def validate(config) -> bool:
     """Validate minimum config to run is OK"""
-    log = logging.getLogger(inspect.stack()[0][3])
+    log = logging.getLogger(__name__)
 
     if not check_config_missing(config):
         return False
@@ -393,6 +489,17 @@ def validate(config) -> bool:
             log.debug("validating config for tx_payload_min...")
             payload_size(tx_payload_min)
 
+        if tx_payload_min and tx_payload_max:
+            if int(tx_payload_min) > int(tx_payload_max):
+                raise ValueError(
+                    f"tx_payload_min ({tx_payload_min}) is greater than tx_payload_max ({tx_payload_max})"
+                )
+
+        tx_cpu = config.get("GENERAL").get("tx_cpu")
+        if tx_cpu not in (None, ""):
+            log.debug("validating config for tx_cpu...")
+            cpu(tx_cpu)
+
     except ValueError:
         log.error("%s", sys.exc_info())
         sys.exit(signal.SIGABRT)
@@ -402,7 +509,7 @@ def validate(config) -> bool:
 
 def check_config_missing(config: Dict) -> bool:
     """Check that the minimal config items exist"""
-    log = logging.getLogger(inspect.stack()[0][3])
+    log = logging.getLogger(__name__)
     try:
         if "GENERAL" not in config:
             raise KeyError("missing general section from configuration")
@@ -437,16 +544,28 @@ def run_command(cmd: list, suppress_output=False) -> str:
     return "completed process return code is non-zero with no stdout or stderr"
 
 
-def get_frequency_bytes(channel: int) -> bytes:
-    """Take a channel number, converts it to a frequency, and finally to bytes"""
+def _channel_to_frequency(channel: int) -> int:
+    """Convert a channel number to its center frequency"""
     if channel == 14:
-        freq = 2484
+        return 2484
     if channel < 14:
-        freq = 2407 + (channel * 5)
-    elif channel > 14:
-        freq = 5000 + (channel * 5)
+        return 2407 + (channel * 5)
+    return 5000 + (channel * 5)
+
+
+# little-endian frequency bytes for every channel we expect to be asked about
+_CHANNEL_FREQUENCY_BYTES = {
+    ch: _channel_to_frequency(ch).to_bytes(2, byteorder="little")
+    for ch in range(1, 200)
+}
 
-    return freq.to_bytes(2, byteorder="little")
+
+def get_frequency_bytes(channel: int) -> bytes:
+    """Take a channel number, converts it to a frequency, and finally to bytes"""
+    freq_bytes = _CHANNEL_FREQUENCY_BYTES.get(channel)
+    if freq_bytes is None:
+        freq_bytes = _channel_to_frequency(channel).to_bytes(2, byteorder="little")
+    return freq_bytes
 
 
 class Base64Encoder(json.JSONEncoder):
@@ -13,7 +13,6 @@ wlan interface data class
 """
 
 # standard library imports
-import inspect
 import logging
 import os
 from collections import namedtuple
@@ -438,7 +437,7 @@ class Interface:
     @staticmethod
     def get_channels_status(iw_phy_channels) -> Dict:
         """Run `iw phy phyX channels` and analyze channel information"""
-        log = logging.getLogger(inspect.stack()[0][3])
+        log = logging.getLogger(__name__)
         if not iw_phy_channels or "command failed" in iw_phy_channels:
             log.warning("unable to detect valid channels from")
             return {}
@@ -662,7 +661,7 @@ class Interface:
         iw_dev_iface_info, iface, get_frequency=False, get_channel=False
     ):
         """Determine what channel or frequency the interface is set to"""
-        log = logging.getLogger(inspect.stack()[0][3])
+        log = logging.getLogger(__name__)
         for line in iw_dev_iface_info.splitlines():
             line = line.lower().strip()
             if "channel" in line:
@@ -714,7 +713,7 @@ class Interface:
     @staticmethod
     def build_iw_phy_list(iw_devs) -> List:
         """Create map of phy to iface"""
-        log = logging.getLogger(inspect.stack()[0][3])
+        log = logging.getLogger(__name__)
         iface = namedtuple("iface", ["name", "ifindex", "addr", "type"])
         phy = namedtuple("phy", ["phy_id", "interfaces"])
         phys = []
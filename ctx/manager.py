@@ -15,18 +15,16 @@ handle ctx
 
 # standard library imports
 import argparse
-import inspect
 import logging
 import multiprocessing as mp
 import os
 import platform
 import signal
 import sys
-from time import sleep
+from multiprocessing.connection import wait
 
 # third party imports
 import scapy  # type: ignore
-from scapy.all import rdpcap  # type: ignore
 
 # app imports
 from . import helpers
@@ -47,7 +45,7 @@ __IFACE = Interface()
 def removeVif():
     """Remove the vif we created if exists"""
     if __IFACE.requires_vif and not __IFACE.removed:
-        log = logging.getLogger(inspect.stack()[0][3])
+        log = logging.getLogger(__name__)
         log.debug("Removing monitor vif ...")
         __IFACE.reset_interface()
         __IFACE.removed = True
@@ -80,11 +78,13 @@ def are_we_root() -> bool:
 
 def start(args: argparse.Namespace):
     """Begin work"""
-    log = logging.getLogger(inspect.stack()[0][3])
+    log = logging.getLogger(__name__)
 
     if args.pytest:
         sys.exit("pytest")
 
+    helpers.verify_tools()
+
     if not are_we_root():
         log.error("ctx must be run with root permissions... exiting...")
         sys.exit(-1)
@@ -193,21 +193,19 @@ def start(args: argparse.Namespace):
     txdata.start()
     __PIDS.append(("txdata", txdata.pid))  # type: ignore
 
-    shutdown = False
-
     # keep main process alive until all subprocesses are finished or closed
-    while running_processes:
-        sleep(0.1)
-        for process in running_processes:
-            # if exitcode is None, it has not stopped yet.
-            if process.exitcode is not None:
-                if __IFACE.requires_vif and not __IFACE.removed:
-                    removeVif()
-                log.debug("shutdown %s process (%s)", process.name, process.exitcode)
-                running_processes.remove(process)
-                finished_processes.append(process)
-                shutdown = True
-
-            if shutdown:
-                process.kill()
-                process.join()
+    #  - block on the process sentinels instead of polling exit codes
+    sentinels = {process.sentinel: process for process in running_processes}
+    while sentinels:
+        for sentinel in wait(list(sentinels)):
+            process = sentinels.pop(sentinel)
+            process.join()
+            if __IFACE.requires_vif and not __IFACE.removed:
+                removeVif()
+            log.debug("shutdown %s process (%s)", process.name, process.exitcode)
+            running_processes.remove(process)
+            finished_processes.append(process)
+
+        # once one subprocess is gone, shut down the rest
+        for process in sentinels.values():
+            process.kill()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+import configparser
+import os
+
+import pytest
+
+from ctx import helpers
+
+CONFIG_INI = os.path.join(os.path.dirname(__file__), "..", "ctx", "config.ini")
+
+
+def stdlib_parse(path):
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    return helpers.convert_configparser_to_dict(parser)
+
+
+def fast_parse(path):
+    return helpers.convert_configparser_to_dict(helpers.load_config(path))
+
+
+def test_shipped_config_matches_configparser():
+    assert fast_parse(CONFIG_INI) == stdlib_parse(CONFIG_INI)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "[GENERAL]\n  channel: 36\n  interface: wlan0\n",
+        "[GENERAL]\nmulti: a\n  b\nKey With Space = 1\nempty =\n",
+        "  [GENERAL]\n    channel: 36\n      continued\n    interface: wlan0\n",
+    ],
+)
+def test_config_matches_configparser(tmp_path, text):
+    path = tmp_path / "config.ini"
+    path.write_text(text)
+    assert fast_parse(str(path)) == stdlib_parse(str(path))
+
+
+def test_config_malformed_line_raises(tmp_path):
+    path = tmp_path / "config.ini"
+    path.write_text("[GENERAL]\nbogus line\nchannel: 36\n")
+    with pytest.raises(configparser.ParsingError):
+        helpers.load_config(str(path))
+
+
+def test_config_missing_section_header_raises(tmp_path):
+    path = tmp_path / "config.ini"
+    path.write_text("channel: 36\n")
+    with pytest.raises(configparser.MissingSectionHeaderError):
+        helpers.load_config(str(path))